@@ -1,5 +1,7 @@
 import os
 import re
+import base64
+import asyncio
 import sys
 import json
 import time
@@ -7,19 +9,36 @@ import yaml
 import queue
 import threading
 import subprocess
-import locale
 import shlex
 import datetime
 import traceback
 import platform
 import sys
 import stat
+from collections import deque
 from pathlib import Path
+from urllib.parse import parse_qs
 from typing import Optional
 
 
 from flask import Flask, Response, jsonify, render_template, request, stream_with_context
 
+# per-line iperf3 event parser (optionally compiled with mypyc, see module docstring)
+from parse_event import parse_event
+
+# libyaml-backed loader when PyYAML was built with it (pure-Python otherwise)
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:  # pragma: no cover - PyYAML without libyaml
+    from yaml import SafeLoader as _YamlLoader
+
+# Optional fast JSON parser (hot path: iperf3 --json-stream lines).
+# orjson.loads accepts str and bytes, just like json.loads.
+try:
+    import orjson as _json
+except ImportError:  # pragma: no cover - stdlib fallback
+    _json = json
+
 # ============================================================
 # PATCH NOTES (2026-02-13)
 # - /run_iperf no longer blocks on expensive interface counter reads.
@@ -44,12 +63,11 @@ BASE_DIR = base_dir()
 LOG_DIR = BASE_DIR / "logs"
 LOG_DIR.mkdir(parents=True, exist_ok=True)
 
-_log_lock = threading.Lock()
-_current_log_path: Optional[Path] = None
-
-def _new_log_path() -> Path:
+def _new_log_path(tag: str = "") -> Path:
     ts = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-    return LOG_DIR / f"iperf_{ts}.log"
+    # tag (run id) keeps parallel runs started in the same second apart
+    tag = re.sub(r"[^A-Za-z0-9_-]", "", tag)[:12]
+    return LOG_DIR / (f"iperf_{ts}_{tag}.log" if tag else f"iperf_{ts}.log")
 
 def _log_write(fp, msg: str):
     try:
@@ -71,6 +89,13 @@ app = Flask(
 # Regex
 # -----------------------------
 BW_RE = re.compile(r"(\d+(?:\.\d+)?)\s*(K|M|G)bits/sec", re.IGNORECASE)
+NUM_RE = re.compile(r"-?\d+(?:\.\d+)?")
+
+# `ethtool <iface>` fields shown in the UI
+ETHTOOL_KEY_RES = {
+    k: re.compile(rf"^[ \t]*{re.escape(k)}:[ \t]*(.*)$", re.MULTILINE)
+    for k in ("Speed", "Duplex", "Link detected", "Auto-negotiation")
+}
 
 # Linux ethtool counter names vary by driver. Keep a "useful" superset.
 LINUX_COUNTER_KEYS = [
@@ -78,6 +103,11 @@ LINUX_COUNTER_KEYS = [
     "rx_dropped", "tx_dropped", "rx_missed_errors", "rx_length_errors",
     "rx_over_errors", "rx_frame_errors", "rx_fifo_errors",
 ]
+# one pass over `ethtool -S` output (lines are indented: "     rx_errors: 0")
+LINUX_COUNTER_RE = re.compile(
+    r"^[ \t]*(" + "|".join(map(re.escape, LINUX_COUNTER_KEYS)) + r"):[ \t]*(\d+)[ \t]*$",
+    re.MULTILINE,
+)
 
 # -----------------------------
 # Settings & Config
@@ -98,16 +128,37 @@ def ensure_executable(p: Path) -> None:
         pass
 
 
+# Parsed config files, re-read only when mtime/size change
+# (entry = (key, data) as one tuple, so threaded requests never pair a new key
+# with old data)
+_settings_cache = {"entry": None}
+_env_cache = {"entry": None}
+
+def _load_cached(p: Path, cache: dict, parse):
+    st = p.stat()
+    key = (st.st_mtime_ns, st.st_size)
+    entry = cache["entry"]
+    if entry is not None and entry[0] == key:
+        return entry[1]
+    data = parse()
+    cache["entry"] = (key, data)
+    return data
+
 def load_settings() -> dict:
     p = BASE_DIR / "settings.json"
     if not p.exists():
         return dict(DEFAULT_SETTINGS)
-    try:
+
+    def parse():
         with open(p, "r", encoding="utf-8") as f:
             data = json.load(f) or {}
         merged = dict(DEFAULT_SETTINGS)
         merged.update({k: data[k] for k in data.keys()})
         return merged
+
+    try:
+        # copy: callers may modify the returned settings
+        return dict(_load_cached(p, _settings_cache, parse))
     except Exception:
         return dict(DEFAULT_SETTINGS)
 
@@ -115,8 +166,12 @@ def load_env_yaml() -> dict:
     p = BASE_DIR / "env.yaml"
     if not p.exists():
         return {"logos": [], "theme": {}}
-    with open(p, "r", encoding="utf-8") as f:
-        return yaml.safe_load(f) or {"logos": [], "theme": {}}
+
+    def parse():
+        with open(p, "r", encoding="utf-8") as f:
+            return yaml.load(f, Loader=_YamlLoader) or {"logos": [], "theme": {}}
+
+    return _load_cached(p, _env_cache, parse)
 
 # -----------------------------
 # iperf3 executable
@@ -146,6 +201,22 @@ def iperf3_cmd() -> str:
 
     return "iperf3"
 
+_iperf3_help: Optional[str] = None
+
+def iperf3_help() -> str:
+    """`iperf3 --help` output, read once (used for feature detection)."""
+    global _iperf3_help
+    if _iperf3_help is not None:
+        return _iperf3_help
+    code, out = run_cmd([iperf3_cmd(), "--help"], timeout=5.0)
+    # only keep a successful read (a missing binary/timeout is retried)
+    if code == 0 and out:
+        _iperf3_help = out
+    return out
+
+def iperf3_supports(flag: str) -> bool:
+    return flag in iperf3_help()
+
 # -----------------------------
 # Helpers: safe subprocess
 # -----------------------------
@@ -154,6 +225,10 @@ def _decode_output(b: bytes) -> str:
     if not b:
         return ""
 
+    # Common case: plain ASCII (NUL bytes would hint at UTF-16, see below).
+    if b.isascii() and b"\x00" not in b:
+        return b.decode("ascii")
+
     # PowerShell sometimes emits UTF-16LE when output is redirected/piped.
     if b.count(b"\x00") > len(b) // 10:
         for enc in ("utf-16", "utf-16-le"):
@@ -162,19 +237,14 @@ def _decode_output(b: bytes) -> str:
             except UnicodeDecodeError:
                 pass
 
-    candidates = [
-        "utf-8",
-        "cp65001",
-        "cp850",
-        locale.getpreferredencoding(False),
-        "cp1252",
-    ]
-    for enc in candidates:
-        try:
-            return b.decode(enc)
-        except UnicodeDecodeError:
-            continue
+    try:
+        return b.decode("utf-8")
+    except UnicodeDecodeError:
+        pass
 
+    # Windows console tools (OEM codepage, e.g. German umlauts in adapter names)
+    if os.name == "nt":
+        return b.decode("cp850", errors="replace")
     return b.decode("utf-8", errors="replace")
 
 def run_cmd(args, shell=False, timeout: Optional[float] = 6.0) -> tuple[int, str]:
@@ -198,6 +268,170 @@ def run_cmd(args, shell=False, timeout: Optional[float] = 6.0) -> tuple[int, str
     except Exception as e:
         return 1, str(e)
 
+# -----------------------------
+# Persistent PowerShell session (Windows)
+# -----------------------------
+class _PSSession:
+    """
+    Long-lived powershell.exe fed line by line via stdin ("-Command -").
+    PowerShell cold start costs 300-800 ms; /api/stats polls every second.
+    Each script is sent base64-encoded on one line (no quoting/codepage issues)
+    and its output is read until a sentinel line carrying the status.
+    """
+
+    SENTINEL = "<<<END>>>"
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._proc: Optional[subprocess.Popen] = None
+        self._lines: "queue.Queue[Optional[bytes]]" = queue.Queue()
+
+    def _start(self) -> bool:
+        try:
+            proc = subprocess.Popen(
+                ["powershell.exe", "-NoLogo", "-NoProfile", "-NonInteractive",
+                 "-ExecutionPolicy", "Bypass", "-Command", "-"],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                creationflags=getattr(subprocess, "CREATE_NO_WINDOW", 0),
+            )
+        except Exception:
+            return False
+
+        lines: "queue.Queue[Optional[bytes]]" = queue.Queue()
+        threading.Thread(target=self._pump, args=(proc, lines), daemon=True).start()
+        self._proc, self._lines = proc, lines
+        # UTF-8 output without BOM ([Text.Encoding]::UTF8 would emit one);
+        # make cmdlet errors terminating so they map to rc=1
+        return self._send(
+            "[Console]::OutputEncoding = New-Object System.Text.UTF8Encoding $false; "
+            "$ErrorActionPreference = 'Stop'"
+        )
+
+    @staticmethod
+    def _pump(proc: subprocess.Popen, lines: "queue.Queue[Optional[bytes]]"):
+        try:
+            for raw in iter(proc.stdout.readline, b""):
+                lines.put(raw)
+        except Exception:
+            pass
+        finally:
+            lines.put(None)
+
+    def _send(self, line: str) -> bool:
+        try:
+            self._proc.stdin.write(line.encode("ascii") + b"\n")
+            self._proc.stdin.flush()
+            return True
+        except Exception:
+            self._close()
+            return False
+
+    def _close(self):
+        proc, self._proc = self._proc, None
+        if proc and proc.poll() is None:
+            try:
+                proc.kill()
+            except Exception:
+                pass
+
+    def run(self, script: str, timeout: float = 6.0) -> Optional[tuple[int, str]]:
+        """Run one script. Returns None if the session is unusable (caller falls back)."""
+        b64 = base64.b64encode(script.encode("utf-8")).decode("ascii")
+        wrapped = (
+            f"$__s = [Text.Encoding]::UTF8.GetString([Convert]::FromBase64String('{b64}')); "
+            "try { Invoke-Expression $__s; $__rc = 0 } "
+            "catch { Write-Output $_.Exception.Message; $__rc = 1 }; "
+            f"Write-Output ('{self.SENTINEL}' + $__rc)"
+        )
+
+        # the timeout covers waiting for the session, too: if another caller
+        # holds it that long, let run_ps spawn a one-shot powershell instead
+        deadline = time.monotonic() + timeout
+        if not self._lock.acquire(timeout=timeout):
+            return None
+        try:
+            if self._proc is None or self._proc.poll() is not None:
+                if not self._start():
+                    return None
+            if not self._send(wrapped):
+                return None
+
+            out: list[str] = []
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    # the script may still be running: drop the session
+                    self._close()
+                    return 124, f"timeout after {timeout}s: {script}"
+                try:
+                    raw = self._lines.get(timeout=remaining)
+                except queue.Empty:
+                    continue
+                if raw is None:
+                    self._close()
+                    return None
+
+                # lstrip: a BOM may still precede the first line on the pipe
+                line = _decode_output(raw).rstrip("\r\n").lstrip("\ufeff")
+                if line.startswith(self.SENTINEL):
+                    rc = 0 if line[len(self.SENTINEL):].strip() == "0" else 1
+                    return rc, "\n".join(out).strip()
+                out.append(line)
+        finally:
+            self._lock.release()
+
+_ps_session = _PSSession()
+
+def ps_literal(value: str) -> str:
+    """
+    PowerShell expression for `value` as a plain string. Base64-decoded inside
+    the script (like the script body in _PSSession.run), so quotes, $(...) or
+    backticks in an iface name can't run code in the shared session.
+    """
+    b64 = base64.b64encode(value.encode("utf-8")).decode("ascii")
+    return f"([Text.Encoding]::UTF8.GetString([Convert]::FromBase64String('{b64}')))"
+
+def run_ps(script: str, timeout: float = 6.0) -> tuple[int, str]:
+    """Run a PowerShell script via the shared session, one-shot spawn as fallback."""
+    res = _ps_session.run(script, timeout=timeout)
+    if res is not None:
+        return res
+    return run_cmd(
+        ["powershell.exe", "-NoLogo", "-NoProfile", "-ExecutionPolicy", "Bypass", "-Command", script],
+        timeout=timeout,
+    )
+
+def iter_pipe_lines(pipe, chunk_size: int = 65536):
+    """
+    Yield complete lines (bytes incl. newline) from a subprocess stdout pipe.
+    POSIX: one blocking os.read() per batch of lines (no per-line readline
+    calls). Windows: fall back to buffered readline().
+    """
+    if os.name == "nt":
+        yield from iter(pipe.readline, b"")
+        return
+
+    fd = pipe.fileno()
+    buf = bytearray()
+    while True:
+        chunk = os.read(fd, chunk_size)
+        if not chunk:
+            break
+        buf += chunk
+        start = 0
+        while True:
+            nl = buf.find(b"\n", start)
+            if nl < 0:
+                break
+            yield bytes(buf[start:nl + 1])
+            start = nl + 1
+        if start:
+            del buf[:start]
+    if buf:
+        yield bytes(buf)
+
 def format_cmd_for_console(cmd: list[str]) -> str:
     if os.name == "nt":
         return subprocess.list2cmdline(cmd)
@@ -206,89 +440,36 @@ def format_cmd_for_console(cmd: list[str]) -> str:
 # -----------------------------
 # Bandwidth conversion
 # -----------------------------
-def convert_bandwidth(value_str: str, target_unit: str) -> float:
-    m = BW_RE.search(value_str.strip())
-    if not m:
-        return 0.0
-    number = float(m.group(1))
-    src = m.group(2).upper()
-
-    src_factor = {"K": 1_000, "M": 1_000_000, "G": 1_000_000_000}.get(src, 1)
-    bits_per_sec = number * src_factor
-
+def normalize_unit(target_unit: str) -> str:
     target_unit = (target_unit or "Mbits").strip()
     if target_unit not in ("Kbits", "Mbits", "Gbits"):
         mapping = {"Kbps": "Kbits", "Mbps": "Mbits", "Gbps": "Gbits"}
         target_unit = mapping.get(target_unit, "Mbits")
+    return target_unit
 
-    tgt_factor = {"Kbits": 1_000, "Mbits": 1_000_000, "Gbits": 1_000_000_000}[target_unit]
-    return bits_per_sec / tgt_factor
+def unit_factor(target_unit: str) -> float:
+    """Multiplier bits/sec -> target unit (compute once per run, not per line)."""
+    divisor = {"Kbits": 1_000.0, "Mbits": 1_000_000.0, "Gbits": 1_000_000_000.0}[normalize_unit(target_unit)]
+    return 1.0 / divisor
 
-# -----------------------------
-# JSON-stream helpers (iperf3 --json-stream)
-# -----------------------------
-def bps_to_selected_unit(bits_per_sec: float, target_unit: str) -> float:
-    target_unit = (target_unit or "Mbits").strip()
-    if target_unit not in ("Kbits", "Mbits", "Gbits"):
-        mapping = {"Kbps": "Kbits", "Mbps": "Mbits", "Gbps": "Gbits"}
-        target_unit = mapping.get(target_unit, "Mbits")
-
-    factor = {"Kbits": 1_000.0, "Mbits": 1_000_000.0, "Gbits": 1_000_000_000.0}[target_unit]
-    return float(bits_per_sec) / factor
-
-def extract_interval_bps(data: dict) -> Optional[float]:
-    if not isinstance(data, dict):
-        return None
-
-    def _bps(obj):
-        if isinstance(obj, dict):
-            v = obj.get("bits_per_second")
-            if isinstance(v, (int, float)):
-                return float(v)
-        return None
-
-    for key in ("sum_received", "sum"):
-        v = _bps(data.get(key))
-        if v is not None:
-            if key == "sum":
-                sender_flag = data.get("sum", {}).get("sender", None)
-                if sender_flag is False:
-                    return v
-                return v
-            return v
-
-    v = _bps(data.get("sum_sent"))
-    if v is not None:
-        return v
-
-    streams = data.get("streams")
-    if isinstance(streams, list) and streams:
-        vals = []
-        for s in streams:
-            vv = _bps(s)
-            if vv is not None:
-                vals.append(vv)
-        if vals:
-            return sum(vals) if len(vals) > 1 else vals[0]
-
-    return None
+def bw_match_to_bps(m: "re.Match[str]") -> float:
+    src_factor = {"K": 1_000, "M": 1_000_000, "G": 1_000_000_000}.get(m.group(2).upper(), 1)
+    return float(m.group(1)) * src_factor
 
 # -----------------------------
 # Interface listing + stats (Linux/Windows)
 # -----------------------------
 def list_interfaces() -> list[str]:
     if os.name == "nt":
-        # NOTE: PowerShell can be slow to cold-start; use a longer timeout.
+        # NOTE: PowerShell can be slow to cold-start (first call starts the
+        # shared session); use a longer timeout.
         # Also add a CIM fallback for systems where Get-NetAdapter isn't available.
         ps1 = 'Get-NetAdapter | Select-Object -ExpandProperty Name | ConvertTo-Json -Compress'
-        code, out = run_cmd(
-            ["powershell.exe", "-NoLogo", "-NoProfile", "-ExecutionPolicy", "Bypass", "-Command", ps1],
-            timeout=15.0
-        )
+        code, out = run_ps(ps1, timeout=15.0)
 
         if code == 0 and out:
             try:
-                data = json.loads(out)
+                data = _json.loads(out)
                 if isinstance(data, list):
                     return [x for x in data if isinstance(x, str) and x.strip()]
                 if isinstance(data, str) and data.strip():
@@ -302,10 +483,7 @@ def list_interfaces() -> list[str]:
             'Where-Object { $_.NetEnabled -eq $true -and $_.NetConnectionID } | '
             'Select-Object -ExpandProperty NetConnectionID | ConvertTo-Json -Compress'
         )
-        code2, out2 = run_cmd(
-            ["powershell.exe", "-NoLogo", "-NoProfile", "-ExecutionPolicy", "Bypass", "-Command", ps2],
-            timeout=15.0
-        )
+        code2, out2 = run_ps(ps2, timeout=15.0)
         if code2 != 0 or not out2:
             # Log a hint so you can see the root cause in console logs
             try:
@@ -316,7 +494,7 @@ def list_interfaces() -> list[str]:
             return []
 
         try:
-            data = json.loads(out2)
+            data = _json.loads(out2)
             if isinstance(data, list):
                 return [x for x in data if isinstance(x, str) and x.strip()]
             if isinstance(data, str) and data.strip():
@@ -337,7 +515,7 @@ def linux_link_info(iface: str) -> dict:
         return {"ok": False, "error": out}
 
     def grab(key):
-        m = re.search(rf"^{re.escape(key)}:\s*(.*)$", out, re.MULTILINE)
+        m = ETHTOOL_KEY_RES[key].search(out)
         return m.group(1).strip() if m else ""
 
     return {
@@ -348,32 +526,79 @@ def linux_link_info(iface: str) -> dict:
         "auto": grab("Auto-negotiation"),
     }
 
+SYSFS_NET = Path("/sys/class/net")
+PROC_NET_DEV = Path("/proc/net/dev")
+
+# /proc/net/dev columns whose meaning matches the sysfs/ethtool counter of the
+# same name (rx "drop" also folds in rx_missed_errors, rx "frame" sums four
+# counters -> those are read elsewhere).
+_PROC_NET_DEV_COLS = {"rx_errors": 2, "rx_fifo_errors": 4, "tx_errors": 10, "tx_dropped": 11}
+
+def procnetdev() -> dict[str, dict]:
+    """Basic error/drop counters of all interfaces from one /proc/net/dev read."""
+    try:
+        text = PROC_NET_DEV.read_text()
+    except OSError:
+        return {}
+    result = {}
+    for line in text.splitlines()[2:]:  # two header lines
+        name, sep, rest = line.partition(":")
+        fields = rest.split()
+        if not sep or len(fields) < 16:
+            continue
+        try:
+            result[name.strip()] = {k: int(fields[i]) for k, i in _PROC_NET_DEV_COLS.items()}
+        except ValueError:
+            continue
+    return result
+
+# iface -> does `ethtool -S` report keys that sysfs lacks (e.g. rx_fcs_errors)?
+_ethtool_has_extra: dict[str, bool] = {}
+
+def linux_sysfs_counters(iface: str, keys) -> dict:
+    """`keys` available as /sys/class/net/<iface>/statistics/<key>."""
+    if not iface or "/" in iface or iface in (".", ".."):
+        return {}
+    stats = SYSFS_NET / iface / "statistics"
+    counters = {}
+    for k in keys:
+        try:
+            counters[k] = int((stats / k).read_text())
+        except (OSError, ValueError):
+            pass
+    return counters
+
 def linux_counters(iface: str) -> dict:
+    # /proc/net/dev + sysfs first: no process spawn. ethtool only for
+    # driver-specific keys, and only as long as it actually delivers some.
+    counters = dict(procnetdev().get(iface, {}))
+    counters.update(linux_sysfs_counters(iface, [k for k in LINUX_COUNTER_KEYS if k not in counters]))
+    missing = [k for k in LINUX_COUNTER_KEYS if k not in counters]
+    if counters and (not missing or _ethtool_has_extra.get(iface) is False):
+        return {"ok": True, "counters": counters}
+
     code, out = run_cmd(["ethtool", "-S", iface], timeout=5.0)
     if code != 0:
+        if counters:
+            _ethtool_has_extra[iface] = False
+            return {"ok": True, "counters": counters}
         return {"ok": False, "error": out, "counters": {}}
-    counters = {}
-    for line in out.splitlines():
-        if ":" not in line:
-            continue
-        k, v = [x.strip() for x in line.split(":", 1)]
-        if k in LINUX_COUNTER_KEYS:
-            try:
-                counters[k] = int(v)
-            except Exception:
-                pass
+
+    extra = {m.group(1): int(m.group(2)) for m in LINUX_COUNTER_RE.finditer(out) if m.group(1) in missing}
+    _ethtool_has_extra[iface] = bool(extra)
+    counters.update(extra)
     return {"ok": True, "counters": counters}
 
 def windows_link_info(iface: str) -> dict:
     ps = (
-        f'Get-NetAdapter -Name "{iface}" | '
+        f'Get-NetAdapter -Name {ps_literal(iface)} | '
         'Select-Object Name, Status, LinkSpeed | ConvertTo-Json'
     )
-    code, out = run_cmd(["powershell", "-NoProfile", "-Command", ps], timeout=6.0)
+    code, out = run_ps(ps, timeout=6.0)
     if code != 0 or not out:
         return {"ok": False, "error": out}
     try:
-        data = json.loads(out)
+        data = _json.loads(out)
         return {
             "ok": True,
             "speed": data.get("LinkSpeed", ""),
@@ -386,15 +611,15 @@ def windows_link_info(iface: str) -> dict:
 
 def windows_counters(iface: str) -> dict:
     ps = (
-        f'Get-NetAdapterStatistics -Name "{iface}" | '
+        f'Get-NetAdapterStatistics -Name {ps_literal(iface)} | '
         "Select-Object ReceivedErrors, OutboundErrors, ReceivedDiscarded, OutboundDiscarded | "
         "ConvertTo-Json"
     )
-    code, out = run_cmd(["powershell", "-NoProfile", "-Command", ps], timeout=6.0)
+    code, out = run_ps(ps, timeout=6.0)
     if code != 0 or not out:
         return {"ok": False, "error": out, "counters": {}}
     try:
-        data = json.loads(out)
+        data = _json.loads(out)
         counters = {}
         for k in ["ReceivedErrors", "OutboundErrors", "ReceivedDiscarded", "OutboundDiscarded"]:
             v = data.get(k, 0)
@@ -406,40 +631,267 @@ def windows_counters(iface: str) -> dict:
     except Exception:
         return {"ok": False, "error": out, "counters": {}}
 
+# Short TTL cache: /api/stats is polled every second, collapse repeated
+# ethtool/PowerShell calls for the same iface.
+_cache_lock = threading.Lock()
+_cache: dict = {}
+
+def _cached(key, ttl: float, fn, keep=None):
+    """`keep(result)` false -> result is returned but not cached (failed lookups)."""
+    now = time.monotonic()
+    with _cache_lock:
+        v = _cache.get(key)
+    if v and now - v[0] < ttl:
+        return v[1]
+    r = fn()
+    if keep is None or keep(r):
+        with _cache_lock:
+            _cache[key] = (now, r)
+    return r
+
+def _cache_clear():
+    """Drop cached link info (the iface list is kept, it's slow on Windows)."""
+    with _cache_lock:
+        for key in [k for k in _cache if k[0] == "link"]:
+            del _cache[key]
+
 def get_link_info(iface: str) -> dict:
     if not iface:
         return {"ok": False, "error": "no iface"}
-    return windows_link_info(iface) if os.name == "nt" else linux_link_info(iface)
+    fn = windows_link_info if os.name == "nt" else linux_link_info
+    return _cached(("link", iface), 2.0, lambda: fn(iface))
 
-def get_counters(iface: str) -> dict:
+def read_counters(iface: str) -> dict:
+    """One counter read (called by CounterSampler)."""
     if not iface:
         return {"ok": False, "error": "no iface", "counters": {}}
     return windows_counters(iface) if os.name == "nt" else linux_counters(iface)
 
+def iface_exists(iface: str) -> bool:
+    """Known interface? Checked before a sampler thread is started for it."""
+    if not iface:
+        return False
+    if os.name == "nt":
+        return iface in _cached(("ifaces",), 30.0, list_interfaces, keep=bool)
+    if "/" in iface or iface in (".", ".."):
+        return False
+    return (SYSFS_NET / iface).exists() or iface in procnetdev()
+
+# -----------------------------
+# Background counter sampler (one thread per polled iface)
+# -----------------------------
+class CounterSampler(threading.Thread):
+    """
+    Reads the counters of one iface every INTERVAL_S into `latest`, so
+    /api/stats is served from memory. `baseline` is the snapshot taken at
+    run start (see rebase). Stops after IDLE_STOP_S without readers.
+    """
+
+    INTERVAL_S = 1.0
+    IDLE_STOP_S = 60.0
+
+    def __init__(self, iface: str):
+        super().__init__(name=f"counters:{iface}", daemon=True)
+        self.iface = iface
+        self.latest: dict = {"ok": False, "error": "no sample yet", "counters": {}}
+        self.baseline: dict = {}
+        self.ready = threading.Event()
+        self._last_read = time.monotonic()
+        # one read at a time: a slow loop sample() must not overwrite the
+        # newer `latest` taken by rebase()
+        self._read_lock = threading.Lock()
+
+    def touch(self):
+        self._last_read = time.monotonic()
+
+    def sample(self) -> dict:
+        with self._read_lock:
+            try:
+                self.latest = read_counters(self.iface)
+            except Exception as e:
+                self.latest = {"ok": False, "error": str(e), "counters": {}}
+            return self.latest
+
+    def rebase(self) -> dict:
+        """Take a fresh sample and use it as baseline for the deltas."""
+        self.touch()
+        now = self.sample()
+        self.baseline = dict(now.get("counters", {})) if now.get("ok") else {}
+        return self.baseline
+
+    def run(self):
+        self.sample()
+        self.ready.set()
+        while True:
+            time.sleep(self.INTERVAL_S)
+            with _samplers_lock:
+                if time.monotonic() - self._last_read > self.IDLE_STOP_S:
+                    if _samplers.get(self.iface) is self:
+                        del _samplers[self.iface]
+                    return
+            self.sample()
+
+_samplers: dict[str, CounterSampler] = {}
+_samplers_lock = threading.Lock()
+
+def sampler_for(iface: str) -> CounterSampler:
+    """Running sampler for `iface` (started on first use, first sample awaited)."""
+    with _samplers_lock:
+        s = _samplers.get(iface)
+        if s is None:
+            s = CounterSampler(iface)
+            _samplers[iface] = s
+            s.start()
+        s.touch()
+    s.ready.wait(timeout=10.0)
+    return s
+
 # -----------------------------
 # iperf run state (thread-safe)
 # -----------------------------
-_state_lock = threading.Lock()
-_output_q: "queue.Queue[Optional[str]]" = queue.Queue()
-_running = False
-_selected_unit = "Mbits"
-_streams = 1
-_iface = ""
-_baseline_counters = {}
-_test_started_at = 0.0
-_proc: Optional[subprocess.Popen] = None
-
-def stop_proc():
-    global _proc
-    if _proc and _proc.poll() is None:
+class _OutputQueue:
+    """
+    Worker -> SSE handoff (single consumer): a deque, whose append/popleft are
+    atomic in CPython, plus one threading.Event as wake-up instead of the
+    Condition that queue.Queue takes on every put/get. None ends the stream.
+    An ASGI stream attaches its event loop and waits on an asyncio.Event.
+    """
+
+    def __init__(self):
+        self._dq: "deque[Optional[str]]" = deque()
+        self._new_data = threading.Event()
+        self._async = None  # (loop, asyncio.Event)
+
+    def put(self, item: Optional[str]):
+        self._dq.append(item)
+        self._new_data.set()
+        a = self._async
+        if a is not None:
+            loop, ev = a
+            try:
+                loop.call_soon_threadsafe(ev.set)
+            except RuntimeError:
+                # event loop already closed
+                self._async = None
+
+    def qsize(self) -> int:
+        return len(self._dq)
+
+    def get_nowait(self) -> Optional[str]:
         try:
-            _proc.terminate()
-            time.sleep(0.5)
-            if _proc.poll() is None:
-                _proc.kill()
-        except Exception:
-            pass
-    _proc = None
+            return self._dq.popleft()
+        except IndexError:
+            raise queue.Empty from None
+
+    def get(self, timeout: Optional[float] = None) -> Optional[str]:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            try:
+                return self._dq.popleft()
+            except IndexError:
+                pass
+            self._new_data.clear()
+            if self._dq:
+                # put() raced with clear()
+                continue
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                raise queue.Empty
+            self._new_data.wait(remaining)
+
+    def attach(self, loop: asyncio.AbstractEventLoop):
+        """Must be called from inside `loop` before using aget()."""
+        self._async = (loop, asyncio.Event())
+
+    def detach(self):
+        self._async = None
+
+    async def aget(self, timeout: float) -> Optional[str]:
+        _, ev = self._async
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                return self._dq.popleft()
+            except IndexError:
+                pass
+            ev.clear()
+            if self._dq:
+                continue
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise queue.Empty
+            try:
+                await asyncio.wait_for(ev.wait(), remaining)
+            except asyncio.TimeoutError:
+                raise queue.Empty from None
+
+class RunContext:
+    """
+    State of one iperf3 run, keyed by run_id. The UI opens /stream_iperf
+    before POSTing /run_iperf, so a context can exist before it is started.
+    """
+
+    def __init__(self, run_id: str):
+        self.run_id = run_id
+        self.q = _OutputQueue()
+        self.proc: Optional[subprocess.Popen] = None
+        self.baseline: dict = {}
+        self.running = False
+        self.started_at = 0.0      # time.time() of /run_iperf, 0 = not started
+        self.finished_at = 0.0     # time.monotonic() when the worker ended
+        self.created_at = time.monotonic()
+        self.unit = "Mbits"
+        self.streams = 1
+        self.iface = ""
+        self.log_path: Optional[Path] = None
+
+    def stop_proc(self):
+        proc = self.proc
+        if proc and proc.poll() is None:
+            try:
+                proc.terminate()
+                time.sleep(0.5)
+                if proc.poll() is None:
+                    proc.kill()
+            except Exception:
+                pass
+        self.proc = None
+
+# run_id -> RunContext. Clients that send no run_id/cid share DEFAULT_RUN_ID
+# (a new run there replaces the previous one, as before).
+DEFAULT_RUN_ID = "default"
+RUN_KEEP_S = 600.0  # finished / never started contexts are dropped after this
+
+_runs: dict[str, RunContext] = {}
+_runs_lock = threading.RLock()
+_latest_run_id = DEFAULT_RUN_ID
+
+def _run_id_from(value) -> str:
+    return str(value or DEFAULT_RUN_ID)[:64]
+
+def _reap_runs():
+    now = time.monotonic()
+    with _runs_lock:
+        for run_id, ctx in list(_runs.items()):
+            done_at = ctx.finished_at or (0.0 if ctx.started_at else ctx.created_at)
+            if done_at and now - done_at > RUN_KEEP_S:
+                del _runs[run_id]
+
+def get_run(run_id: Optional[str] = None) -> Optional[RunContext]:
+    """Context for `run_id`, or of the most recently started run."""
+    with _runs_lock:
+        return _runs.get(run_id or _latest_run_id)
+
+def run_for_stream(run_id: str) -> RunContext:
+    """Context an SSE client reads from; created (not started) if needed."""
+    with _runs_lock:
+        _reap_runs()
+        ctx = _runs.get(run_id)
+        if ctx is None or (ctx.finished_at and ctx.q.qsize() == 0):
+            # nothing left to deliver: wait for the next run under this id
+            ctx = RunContext(run_id)
+            _runs[run_id] = ctx
+        return ctx
 
 # -----------------------------
 # Routes
@@ -467,28 +919,36 @@ def api_interfaces():
 
 @app.route("/api/stats")
 def api_stats():
-    global _baseline_counters, _test_started_at
-    iface = request.args.get("iface", "") or _iface
-    link = get_link_info(iface)
-    counters_now = get_counters(iface)
+    ctx = get_run(request.args.get("run_id") or None)
+    iface = request.args.get("iface", "") or (ctx.iface if ctx else "")
+    # only names the OS knows reach the link/counter readers (and PowerShell)
+    if iface_exists(iface):
+        link = get_link_info(iface)
+        sampler = sampler_for(iface)
+        counters_now = sampler.latest
+        baseline = ctx.baseline if ctx and ctx.iface == iface else sampler.baseline
+    else:
+        error = "unknown iface" if iface else "no iface"
+        link = {"ok": False, "error": error}
+        counters_now, baseline = {"ok": False, "error": error, "counters": {}}, {}
 
     delta = {}
     if counters_now.get("ok") and isinstance(counters_now.get("counters"), dict):
         now = counters_now["counters"]
         for k, v in now.items():
-            base = _baseline_counters.get(k, v)
+            base = baseline.get(k, v)
             try:
                 delta[k] = int(v) - int(base)
             except Exception:
                 pass
 
-    with _state_lock:
-        running = _running
-        unit = _selected_unit
-        streams = _streams
-        started_at = _test_started_at
+    running = ctx.running if ctx else False
+    unit = ctx.unit if ctx else "Mbits"
+    streams = ctx.streams if ctx else 1
+    started_at = ctx.started_at if ctx else 0.0
 
     return jsonify({
+        "run_id": ctx.run_id if ctx else "",
         "iface": iface,
         "running": running,
         "unit": unit,
@@ -506,11 +966,12 @@ def _cmd_str(cmd: list[str]) -> str:
 
 @app.route("/run_iperf", methods=["POST"])
 def run_iperf():
-    global _output_q, _running, _selected_unit, _streams, _iface, _baseline_counters, _test_started_at, _proc
-    global _current_log_path
+    global _latest_run_id
 
-    app.logger.info("RUN pid=%s tid=%s qid(before)=%s", os.getpid(), threading.get_ident(), id(_output_q))
     data = request.get_json(silent=True) or {}
+    # the UI sends its SSE client id as cid (and uses it for /stream_iperf too)
+    run_id = _run_id_from(data.get("run_id") or data.get("cid"))
+    app.logger.info("RUN pid=%s tid=%s run_id=%s", os.getpid(), threading.get_ident(), run_id)
     protocol = (data.get("protocol") or "tcp").lower()
     mode = (data.get("mode") or "upload").lower()
 
@@ -518,10 +979,10 @@ def run_iperf():
 
     target = data.get("target") or ""
     port = str(data.get("port") or settings.get("iperf_port", 5201))
-    _streams = int(data.get("streams") or 1)
+    streams = int(data.get("streams") or 1)
     bandwidth = str(data.get("bandwidth") or "0")
-    _selected_unit = data.get("units") or "Mbits"
-    _iface = data.get("iface") or settings.get("default_iface", "")
+    units = data.get("units") or "Mbits"
+    iface = data.get("iface") or settings.get("default_iface", "")
 
     duration = str(data.get("duration") or "10")
     interval = str(data.get("interval") or "1")
@@ -530,16 +991,38 @@ def run_iperf():
     # iperf3 in --json-stream mode may output nothing until the control connection is established.
     connect_timeout_ms = str(data.get("connect_timeout_ms") or "3000")
 
+    # Only the final result (no interval display): fewer lines to parse and stream.
+    # JSON true / 1 / "true" only ("false" must not switch it on)
+    sum_only_arg = data.get("sum_only")
+    sum_only = sum_only_arg is True or sum_only_arg == 1 or (
+        isinstance(sum_only_arg, str) and sum_only_arg.strip().lower() in ("1", "true")
+    )
+    # Skip the first N seconds (TCP slow start) in the results.
+    try:
+        omit_seconds = int(data.get("omit_seconds") or 0)
+    except (TypeError, ValueError):
+        omit_seconds = -1
+
     if not target:
         return jsonify({"error": "Target is required."}), 400
     if protocol not in ("tcp", "udp"):
         return jsonify({"error": 'Invalid protocol. Must be "tcp" or "udp".'}), 400
-    if _streams <= 0:
+    if streams <= 0:
         return jsonify({"error": "Streams must be a positive integer."}), 400
-
-    cmd = [iperf3_cmd(), "-c", target, "-p", str(port), "-P", str(_streams)]
+    if omit_seconds < 0:
+        return jsonify({"error": "omit_seconds must be a non-negative integer."}), 400
+
+    cmd = [iperf3_cmd(), "-c", target, "-p", str(port), "-P", str(streams)]
+    sum_only_flag = sum_only and iperf3_supports("--json-stream-sum-only")
+    if sum_only and not sum_only_flag:
+        # older iperf3: disable periodic reports, only the "end" event remains
+        interval = "0"
     cmd += ["-i", interval, "-t", duration]
+    if omit_seconds:
+        cmd += ["-O", str(omit_seconds)]
     cmd.append("--json-stream")
+    if sum_only_flag:
+        cmd.append("--json-stream-sum-only")
     cmd.append("--forceflush")
     cmd += ["--connect-timeout", connect_timeout_ms]
 
@@ -551,49 +1034,61 @@ def run_iperf():
     cmd_str = _cmd_str(cmd)
     app.logger.info("iperf3 cmd: %s", cmd_str)
 
-    # neues Logfile pro Run
-    with _log_lock:
-        _current_log_path = _new_log_path()
-        lp = _current_log_path
-    app.logger.info("iperf logfile: %s", str(lp))
-
     # NOTE: The expensive baseline counter read was previously done here
     # and could block for a long time (PowerShell/ethtool hangs).
     # We now reset quickly and capture baseline in the worker thread.
-    with _state_lock:
-        stop_proc()
-        _output_q = queue.Queue()
-        _running = True
-        _test_started_at = time.time()
-        _baseline_counters = {}
-
-    # capture immutable values for this run (avoid races if user starts another run quickly)
-    run_iface = _iface
-    run_unit = _selected_unit
-    run_cmd_str = cmd_str
+    # fresh link info for the new run
+    _cache_clear()
+
+    # Reuse the context an SSE client is already waiting on; a rerun under the
+    # same id (e.g. DEFAULT_RUN_ID) replaces the old run. The UI uses a new id
+    # per click and names its last one in prev_run_id: that run is stopped too
+    # (it may still be running after a UI-side timeout or a page reload).
+    prev_run_id = _run_id_from(data.get("prev_run_id")) if data.get("prev_run_id") else ""
+    stale: list[RunContext] = []
+    with _runs_lock:
+        _reap_runs()
+        ctx = _runs.get(run_id)
+        if ctx is None or ctx.started_at:
+            if ctx is not None:
+                stale.append(ctx)
+            ctx = RunContext(run_id)
+            _runs[run_id] = ctx
+        prev = _runs.get(prev_run_id) if prev_run_id != run_id else None
+        if prev is not None and prev.running:
+            stale.append(prev)
+        ctx.running = True
+        ctx.started_at = time.time()
+        ctx.unit = units
+        ctx.streams = streams
+        ctx.iface = iface
+        ctx.log_path = _new_log_path("" if run_id == DEFAULT_RUN_ID else run_id)
+        _latest_run_id = run_id
+    for old in stale:
+        old.stop_proc()
+
+    lp = ctx.log_path
+    app.logger.info("iperf logfile: %s", str(lp))
 
-    _output_q.put(f"CMD: {run_cmd_str}")
-    _output_q.put(f"LOGFILE: {lp}")
+    run_unit = normalize_unit(units)
+    run_factor = unit_factor(run_unit)
 
-    app.logger.info("RUN pid=%s qid(after)=%s qsize=%s", os.getpid(), id(_output_q), _output_q.qsize())
+    ctx.q.put(f"CMD: {cmd_str}")
+    ctx.q.put(f"LOGFILE: {lp}")
 
-    def worker(out_q: "queue.Queue[str|None]", cmd_to_run: list[str], iface_for_run: str, unit_for_run: str):
-        global _running, _proc, _baseline_counters
-        global _current_log_path
+    def worker(ctx: RunContext, cmd_to_run: list[str], factor_for_run: float):
+        out_q = ctx.q
+        iface_for_run = ctx.iface
+        log_path = ctx.log_path
 
         out_q.put("WORKER: started")
 
         # Baseline counters (moved here so /run_iperf returns immediately)
-        try:
-            base = get_counters(iface_for_run)
-            with _state_lock:
-                _baseline_counters = base.get("counters", {}) if base.get("ok") else {}
-        except Exception:
-            with _state_lock:
-                _baseline_counters = {}
-
-        with _log_lock:
-            log_path = _current_log_path or _new_log_path()
+        if iface_exists(iface_for_run):
+            try:
+                ctx.baseline = sampler_for(iface_for_run).rebase()
+            except Exception:
+                ctx.baseline = {}
 
         try:
             with open(log_path, "a", encoding="utf-8", errors="replace") as fp:
@@ -603,7 +1098,7 @@ def run_iperf():
                 _log_write(fp, f"cmd: {_cmd_str(cmd_to_run)}")
                 _log_write(fp, f"connect_timeout_ms: {connect_timeout_ms}")
                 _log_write(fp, f"iface: {iface_for_run}")
-                _log_write(fp, f"unit: {unit_for_run}")
+                _log_write(fp, f"unit: {run_unit}")
 
                 creationflags = 0
                 if os.name == "nt":
@@ -614,55 +1109,37 @@ def run_iperf():
                     stdout=subprocess.PIPE,
                     stderr=subprocess.STDOUT,
                     text=False,
-                    bufsize=0,
+                    bufsize=-1,  # only used by the Windows readline() fallback; POSIX reads the fd via os.read
                     creationflags=creationflags,
                 )
-                _proc = proc
+                ctx.proc = proc
                 out_q.put(f"WORKER: iperf pid={proc.pid}")
                 _log_write(fp, f"pid: {proc.pid}")
 
                 if proc.stdout is not None:
-                    for raw in iter(proc.stdout.readline, b""):
-                        line = _decode_output(raw).strip()
+                    for raw in iter_pipe_lines(proc.stdout):
+                        # iperf3 output is ASCII/UTF-8: no multi-encoding probing per line.
+                        # JSON-stream lines are parsed from the bytes directly.
+                        is_json = raw[:1] == b"{"
+                        line = raw.decode("utf-8", errors="replace").strip()
                         if not line:
                             continue
 
                         # alles in Datei loggen
                         _log_write(fp, f"OUT: {line}")
 
-                        try:
-                            obj = json.loads(line)
-                        except Exception:
+                        if not is_json:
                             # nicht-JSON Text direkt an UI/Stream
                             out_q.put(line)
                             continue
 
-                        event = obj.get("event")
-                        data = obj.get("data")
-
-                        if event == "interval":
-                            if isinstance(data, dict):
-                                bps = extract_interval_bps(data)
-                                if bps is not None:
-                                    v = bps_to_selected_unit(bps, unit_for_run)
-                                    out_q.put(f"{v}")
-                            continue
-
-                        if event == "end":
-                            if isinstance(data, dict):
-                                bps = extract_interval_bps(data)
-                                if bps is not None:
-                                    v = bps_to_selected_unit(bps, unit_for_run)
-                                    out_q.put(f"{v}")
-                            continue
-
-                        if event == "error":
-                            out_q.put(f"ERROR: {data}")
-                            continue
-
-                        if event == "server_output_text":
-                            out_q.put((data or "").strip() if isinstance(data, str) else str(data))
+                        try:
+                            item = parse_event(raw, factor_for_run)
+                        except ValueError:
+                            out_q.put(line)
                             continue
+                        if item is not None:
+                            out_q.put(item)
 
                 proc.wait()
                 _log_write(fp, f"returncode: {proc.returncode}")
@@ -679,111 +1156,139 @@ def run_iperf():
             except Exception:
                 pass
         finally:
+            ctx.running = False
+            ctx.finished_at = time.monotonic()
             out_q.put(None)
-            with _state_lock:
-                _running = False
-
-    threading.Thread(target=worker, args=(_output_q, cmd, run_iface, run_unit), daemon=True).start()
-
-    with _log_lock:
-        lp_str = str(_current_log_path) if _current_log_path else ""
-    return jsonify({"status": "iperf3 started", "cmd": cmd_str, "logfile": lp_str}), 200
 
+    threading.Thread(target=worker, args=(ctx, cmd, run_factor), daemon=True).start()
+
+    return jsonify({"status": "iperf3 started", "run_id": run_id, "cmd": cmd_str, "logfile": str(lp)}), 200
+
+
+class _SSEFormatter:
+    """Turns worker queue items into SSE payloads (shared by the WSGI and ASGI stream)."""
+
+    def __init__(self, ctx: RunContext):
+        self.ctx = ctx
+        self.last_val = 0.0
+        # unit factor for the text fallback, refreshed only when the unit changes
+        # (a context may get its unit only when the run starts)
+        self.unit = ctx.unit
+        self.factor = unit_factor(self.unit)
+
+    def feed(self, item: Optional[str]) -> tuple[list[str], bool]:
+        """Returns (payloads, done) for one queue item."""
+        if item is None:
+            return ["-1"], True
+
+        s = (item or "").strip()
+        if not s:
+            return [], False
+        low = s.lower()
+
+        # CMD/LOGFILE/etc direkt weitergeben
+        if s.startswith("CMD:") or s.startswith("LOGFILE:") or s.startswith("WORKER:"):
+            return [s], False
+
+        # Worker-Fehler
+        if low.startswith("error:"):
+            return [s, "-1"], True
+
+        # typische iperf Fehlertexte
+        if (
+            low.startswith("iperf3:") or
+            "unable to connect" in low or
+            "connection refused" in low or
+            "timed out" in low or
+            "failed" in low or
+            "no route" in low
+        ):
+            return [f"ERROR: {s}", "-1"], True
+
+        # "server busy"
+        if "server is busy" in low or "unable to send control message" in low:
+            return ["server is busy"], False
+
+        # nackte Zahl (vom JSON-stream Parser)
+        if NUM_RE.fullmatch(s):
+            try:
+                v = float(s)
+            except Exception:
+                v = self.last_val
+            self.last_val = v
+            return [f"{v}"], False
+
+        # iperf Textzeile mit "... Mbits/sec" (Fallback)
+        m = BW_RE.search(s)
+        if m:
+            if self.ctx.unit != self.unit:
+                self.unit = self.ctx.unit
+                self.factor = unit_factor(self.unit)
+            v = bw_match_to_bps(m) * self.factor
+            if ("[SUM]" in s) and ("sender" not in low):
+                self.last_val = v
+            elif self.ctx.streams == 1:
+                self.last_val = v
+            return [f"{self.last_val}"], False
+
+        # sonstige Textausgabe (debug/info)
+        return [s], False
+
+    def feed_batch(self, item: Optional[str], get_nowait) -> tuple[list[str], bool]:
+        """feed() `item` plus whatever is already queued (up to SSE_BATCH_MAX items)."""
+        payloads, done = self.feed(item)
+        n = 1
+        while not done and n < SSE_BATCH_MAX:
+            try:
+                item = get_nowait()
+            except queue.Empty:
+                break
+            more, done = self.feed(item)
+            payloads.extend(more)
+            n += 1
+        return payloads, done
+
+# Comment + retry as complete SSE frames (end with blank line)
+SSE_PREAMBLE = (": stream\n\n", "retry: 1000\n\n", "data: stream_connected\n\n")
+SSE_BATCH_MAX = 32        # queued items coalesced into one SSE event (bounds latency)
+SSE_KEEPALIVE_S = 5.0     # idle time before a ping (the UI's no-data timeout is >= 15 s)
+
+def sse_frame(payloads: list[str]) -> str:
+    """One SSE event, one "data:" line per payload line (the client splits on newlines)."""
+    return "".join(f"data: {line}\n" for p in payloads for line in p.splitlines()) + "\n"
 
 @app.route("/stream_iperf", methods=["GET"])
 def stream_iperf():
+    ctx = run_for_stream(_run_id_from(request.args.get("run_id") or request.args.get("cid")))
     try:
         print(
-            f"STREAM connect pid={os.getpid()} tid={threading.get_ident()} qid={id(_output_q)} qsize={_output_q.qsize()}",
+            f"STREAM connect pid={os.getpid()} tid={threading.get_ident()} run_id={ctx.run_id} qsize={ctx.q.qsize()}",
             flush=True,
         )
     except Exception:
         pass
 
     def generate():
-        # Comment + retry as complete SSE frames (end with blank line)
-        yield ": stream\n\n"
-        yield "retry: 1000\n\n"
-        yield "data: stream_connected\n\n"
+        yield from SSE_PREAMBLE
 
-        last_val = 0.0
-        q = _output_q
+        q = ctx.q
+        fmt = _SSEFormatter(ctx)
 
         try:
             while True:
                 try:
-                    item = q.get(timeout=1.0)
+                    item = q.get(timeout=SSE_KEEPALIVE_S)
                 except queue.Empty:
                     # keepalive ping
                     yield "data: ping\n\n"
                     continue
 
-                if item is None:
-                    yield "data: -1\n\n"
-                    break
-
-                s = (item or "").strip()
-                if not s:
-                    continue
-                low = s.lower()
-
-                # CMD/LOGFILE/etc direkt weitergeben
-                if s.startswith("CMD:") or s.startswith("LOGFILE:") or s.startswith("WORKER:"):
-                    yield f"data: {s}\n\n"
-                    continue
-
-                # Worker-Fehler
-                if low.startswith("error:"):
-                    yield f"data: {s}\n\n"
-                    yield "data: -1\n\n"
+                payloads, done = fmt.feed_batch(item, q.get_nowait)
+                if payloads:
+                    yield sse_frame(payloads)
+                if done:
                     break
 
-                # typische iperf Fehlertexte
-                if (
-                    low.startswith("iperf3:") or
-                    "unable to connect" in low or
-                    "connection refused" in low or
-                    "timed out" in low or
-                    "failed" in low or
-                    "no route" in low
-                ):
-                    yield f"data: ERROR: {s}\n\n"
-                    yield "data: -1\n\n"
-                    break
-
-                # "server busy"
-                if "server is busy" in low or "unable to send control message" in low:
-                    yield "data: server is busy\n\n"
-                    continue
-
-                # nackte Zahl (vom JSON-stream Parser)
-                if re.fullmatch(r"-?\d+(?:\.\d+)?", s):
-                    try:
-                        v = float(s)
-                    except Exception:
-                        v = last_val
-                    last_val = v
-                    yield f"data: {v}\n\n"
-                    continue
-
-                # iperf Textzeile mit "... Mbits/sec" (Fallback)
-                m = BW_RE.search(s)
-                if m:
-                    v = convert_bandwidth(m.group(0), _selected_unit)
-                    if ("[SUM]" in s) and ("sender" not in low):
-                        last_val = v
-                        yield f"data: {v}\n\n"
-                    else:
-                        if _streams == 1:
-                            last_val = v
-                            yield f"data: {v}\n\n"
-                        else:
-                            yield f"data: {last_val}\n\n"
-                    continue
-
-                # sonstige Textausgabe (debug/info)
-                yield f"data: {s}\n\n"
-
         except GeneratorExit:
             return
         except Exception as e:
@@ -805,12 +1310,124 @@ def stream_iperf():
     )
 
 
-@app.route("/iperf_version", methods=["GET"])
-def iperf_version():
+_iperf_version_info: Optional[dict] = None
+
+def iperf_version_info() -> dict:
+    """iperf3 version + hostname, read once (neither changes while the app runs)."""
+    global _iperf_version_info
+    if _iperf_version_info is not None:
+        return _iperf_version_info
     code, out = run_cmd([iperf3_cmd(), "-v"], timeout=5.0)
     first = out.splitlines()[0] if out else "unknown"
     code2, host = run_cmd(["hostname"], shell=False, timeout=3.0)
-    return jsonify({"version": f"{first} client running on: {host}"}), 200
+    info = {"version": f"{first} client running on: {host}"}
+    # only keep a successful lookup (a missing binary/timeout is retried)
+    if code == 0 and code2 == 0:
+        _iperf_version_info = info
+    return info
+
+@app.route("/iperf_version", methods=["GET"])
+def iperf_version():
+    return jsonify(iperf_version_info()), 200
+
+
+# -----------------------------
+# ASGI entry (optional)
+# -----------------------------
+# Serve with an ASGI server from the APP directory, e.g.
+#   hypercorn app:asgi_app --bind 0.0.0.0:5000
+#   uvicorn app:asgi_app --host 0.0.0.0 --port 5000
+# /stream_iperf then runs on the event loop (an idle SSE client does not hold
+# a thread for the whole test); all other routes go through the Flask app.
+try:
+    from asgiref.wsgi import WsgiToAsgi
+except ImportError:  # pragma: no cover - only needed for asgi_app
+    WsgiToAsgi = None
+
+_wsgi_asgi = WsgiToAsgi(app) if WsgiToAsgi is not None else None
+
+async def _stream_iperf_asgi(scope, receive, send):
+    await send({
+        "type": "http.response.start",
+        "status": 200,
+        "headers": [
+            (b"content-type", b"text/event-stream; charset=utf-8"),
+            (b"cache-control", b"no-cache"),
+            (b"x-accel-buffering", b"no"),
+        ],
+    })
+
+    disconnected = asyncio.Event()
+
+    async def watch_disconnect():
+        while True:
+            msg = await receive()
+            if msg["type"] == "http.disconnect":
+                disconnected.set()
+                return
+
+    async def write(chunk: str):
+        await send({"type": "http.response.body", "body": chunk.encode("utf-8"), "more_body": True})
+
+    watcher = asyncio.create_task(watch_disconnect())
+    q = None
+    try:
+        for frame in SSE_PREAMBLE:
+            await write(frame)
+
+        args = parse_qs(scope.get("query_string", b"").decode("latin-1"))
+        run_id = (args.get("run_id") or args.get("cid") or [""])[0]
+        ctx = run_for_stream(_run_id_from(run_id))
+
+        q = ctx.q
+        q.attach(asyncio.get_running_loop())
+        fmt = _SSEFormatter(ctx)
+
+        while not disconnected.is_set():
+            try:
+                item = await q.aget(SSE_KEEPALIVE_S)
+            except queue.Empty:
+                # keepalive ping
+                await write("data: ping\n\n")
+                continue
+
+            payloads, done = fmt.feed_batch(item, q.get_nowait)
+            if payloads:
+                await write(sse_frame(payloads))
+            if done:
+                break
+
+    except Exception as e:
+        try:
+            await write(f"data: ERROR: stream exception: {e}\n\n")
+            await write("data: -1\n\n")
+        except Exception:
+            pass
+    finally:
+        if q is not None:
+            q.detach()
+        watcher.cancel()
+        try:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+        except Exception:
+            pass
+
+async def asgi_app(scope, receive, send):
+    if scope["type"] == "lifespan":
+        while True:
+            msg = await receive()
+            if msg["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif msg["type"] == "lifespan.shutdown":
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    if scope["type"] == "http" and scope.get("method") == "GET" and scope.get("path") == "/stream_iperf":
+        return await _stream_iperf_asgi(scope, receive, send)
+
+    if _wsgi_asgi is None:
+        raise RuntimeError("asgi_app needs asgiref (pip install asgiref)")
+    return await _wsgi_asgi(scope, receive, send)
 
 
 if __name__ == "__main__":
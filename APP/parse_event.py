@@ -0,0 +1,119 @@
+"""
+Per-line parser for iperf3 --json-stream output (hot path of the worker).
+
+No Flask/app state in here and fully annotated, so the module can be
+compiled to a C extension for high-rate runs (many streams, -i 0.1):
+
+    cd APP && mypyc parse_event.py
+
+The compiled module (parse_event.*.so / .pyd) is picked up by the same
+import in app.py; without it this plain Python file is used.
+"""
+import re
+from typing import Any, Final, Optional
+
+# Optional fast JSON parser; orjson.loads accepts bytes just like json.loads.
+try:
+    from orjson import loads as _loads
+except ImportError:  # pragma: no cover - stdlib fallback
+    from json import loads as _loads  # type: ignore[assignment]
+
+# Fast path: pick the event name and the summary bits_per_second straight
+# from the raw bytes, without building the dict tree.
+_FAST_EVENT_RE: Final = re.compile(rb'^\{\s*"event"\s*:\s*"([a-z_]+)"')
+_FAST_SUM_BPS_RE: Final = re.compile(
+    rb'"(sum_received|sum|sum_sent)"\s*:\s*\{[^{}]*?"bits_per_second"\s*:\s*(-?[0-9.eE+-]+)'
+)
+_FAST_SUM_KEYS: Final = (b"sum_received", b"sum", b"sum_sent")  # same priority as extract_interval_bps
+
+
+def fast_interval_bps(raw: bytes) -> tuple[Optional[str], Optional[float]]:
+    """
+    Scan one raw iperf3 --json-stream line.
+    Returns (event, bps); bps is None if the line needs a full JSON parse.
+    """
+    m = _FAST_EVENT_RE.match(raw)
+    if not m:
+        return None, None
+    event = m.group(1).decode("ascii")
+    if event not in ("interval", "end"):
+        return event, None
+
+    found: dict[bytes, bytes] = {}
+    for mm in _FAST_SUM_BPS_RE.finditer(raw):
+        found.setdefault(mm.group(1), mm.group(2))
+    for key in _FAST_SUM_KEYS:
+        if key in found:
+            try:
+                return event, float(found[key])
+            except ValueError:
+                return event, None
+    return event, None
+
+
+def _bps(obj: Any) -> Optional[float]:
+    if isinstance(obj, dict):
+        v = obj.get("bits_per_second")
+        if isinstance(v, (int, float)):
+            return float(v)
+    return None
+
+
+def extract_interval_bps(data: Any) -> Optional[float]:
+    if not isinstance(data, dict):
+        return None
+
+    # priority: sum_received > sum > sum_sent > total over streams
+    v = _bps(data.get("sum_received"))
+    if v is not None:
+        return v
+    v = _bps(data.get("sum"))
+    if v is not None:
+        return v
+    v = _bps(data.get("sum_sent"))
+    if v is not None:
+        return v
+
+    streams = data.get("streams")
+    if isinstance(streams, list):
+        total: Optional[float] = None
+        for s in streams:
+            vv = _bps(s)
+            if vv is not None:
+                total = vv if total is None else total + vv
+        return total
+
+    return None
+
+
+def parse_event(raw: bytes, factor: float) -> Optional[str]:
+    """
+    One --json-stream line -> item for the output queue:
+    interval/end -> rate already multiplied by `factor` (bits/sec -> run unit),
+    error -> "ERROR: ...", server_output_text -> the text,
+    None for events the UI doesn't show.
+    Raises ValueError if the line is not a JSON object.
+    """
+    # interval/end: regex fast path, no full parse
+    _, bps = fast_interval_bps(raw)
+    if bps is not None:
+        return f"{bps * factor}"
+
+    obj = _loads(raw)
+    if not isinstance(obj, dict):
+        raise ValueError("not a JSON object")
+
+    event = obj.get("event")
+    data = obj.get("data")
+
+    if event == "interval" or event == "end":
+        bps = extract_interval_bps(data)
+        return f"{bps * factor}" if bps is not None else None
+
+    if event == "error":
+        return f"ERROR: {data}"
+
+    if event == "server_output_text":
+        return (data or "").strip() if isinstance(data, str) else str(data)
+
+    return None
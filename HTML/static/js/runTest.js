@@ -159,10 +159,14 @@ if (!window.__iperfBound) {
     // SSE zuerst öffnen, dann /run_iperf starten (parallel).
     // Dadurch bekommst du sofort stream_connected/ping und kein "tot" Gefühl.
     // ===========================================================
+    // vorheriger Run dieses Tabs: wird vom Server beendet, falls er noch läuft
+    // (z. B. nach No-Data-Timeout oder Reload)
+    const prevRunId = state.runId;
     const cid = crypto.randomUUID();
+    state.runId = cid;
 
     console.time("sse_open");
-    eventSource = new EventSource(`/stream_iperf?cid=${encodeURIComponent(cid)}&ts=${Date.now()}`);
+    eventSource = new EventSource(`/stream_iperf?run_id=${encodeURIComponent(cid)}&ts=${Date.now()}`);
     window.__iperfES = eventSource;
 
     console.log("[SSE] creating", { cid, url: eventSource.url });
@@ -176,14 +180,9 @@ if (!window.__iperfBound) {
       armNoDataTimer();
     });
 
-    eventSource.addEventListener("message", (e) => {
-      const s = (e.data ?? "").trim();
-      console.log("[SSE] msg", { cid, data: s });
-
-      // ✅ bei JEDEM Event resetten (auch ping)
-      armNoDataTimer();
-
-      if (!s || s === "ping") return;
+    // Eine SSE-Zeile verarbeiten; true = Stream beendet
+    const handleLine = (s) => {
+      if (!s || s === "ping") return false;
 
       // Ende-Marker
       if (s === "-1") {
@@ -198,25 +197,25 @@ if (!window.__iperfBound) {
 
         console.log("[SSE] end", { cid });
         cleanup({ reset: false, closeStream: true });
-        return;
+        return true;
       }
 
       if (s === "server is busy") {
         if (statusEl) statusEl.textContent = "Server is Busy";
         resultEl.textContent += "server is busy\n";
         cleanup({ reset: true, closeStream: true });
-        return;
+        return true;
       }
 
       if (s.startsWith("CMD:") || s.startsWith("WORKER:") || s.startsWith("LOGFILE:")) {
         resultEl.textContent += s + "\n";
-        return;
+        return false;
       }
 
       const bandwidthValue = extractBandwidth(s, units);
       if (Number.isNaN(bandwidthValue)) {
         resultEl.textContent += s + "\n";
-        return;
+        return false;
       }
 
       updateGauge(bandwidthValue);
@@ -232,6 +231,19 @@ if (!window.__iperfBound) {
         `Running: ${bandwidthValue.toFixed(2)} ${units}\n(${protocol.toUpperCase()} • ${mode} • ${streams} Streams)`,
         false
       );
+      return false;
+    };
+
+    eventSource.addEventListener("message", (e) => {
+      console.log("[SSE] msg", { cid, data: e.data });
+
+      // ✅ bei JEDEM Event resetten (auch ping)
+      armNoDataTimer();
+
+      // Server bündelt mehrere Werte in ein Event (eine "data:"-Zeile pro Wert)
+      for (const line of (e.data ?? "").split("\n")) {
+        if (handleLine(line.trim())) break;
+      }
     });
 
     eventSource.addEventListener("error", (e) => {
@@ -271,7 +283,8 @@ if (!window.__iperfBound) {
           port,
           units,
           iface,
-          cid, // server kann cid ignorieren, falls nicht implementiert
+          run_id: cid, // gleiche ID wie /stream_iperf -> eigener Run-Kontext
+          prev_run_id: prevRunId,
         }),
       });
       console.timeEnd("run_iperf");
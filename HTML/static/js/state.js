@@ -7,6 +7,11 @@ const state = {
   mode: 'upload',            // matches HTML (Upload active)
   units: 'Mbps',
   iface: '',                 // NEW: selected interface name
+  // run_id of the last started test (for /api/stats and prev_run_id);
+  // kept in sessionStorage so a reload can still stop that run
+  runId: (() => {
+    try { return sessionStorage.getItem('iperfRunId') || ''; } catch (_) { return ''; }
+  })(),
   speedtest_state: 'READY',
 
   bandwidthSum: 0,
@@ -39,6 +44,12 @@ export default {
   get iface() { return state.iface; },
   set iface(value) { state.iface = value; },
 
+  get runId() { return state.runId; },
+  set runId(value) {
+    state.runId = value;
+    try { sessionStorage.setItem('iperfRunId', value); } catch (_) {}
+  },
+
   get speedtest_state() { return state.speedtest_state; },
   set speedtest_state(value) { state.speedtest_state = value; },
 
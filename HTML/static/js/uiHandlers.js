@@ -117,7 +117,8 @@ async function refreshStats() {
   if (!state.iface) return;
 
   try {
-    const r = await fetch('/api/stats?iface=' + encodeURIComponent(state.iface));
+    const runQs = state.runId ? '&run_id=' + encodeURIComponent(state.runId) : '';
+    const r = await fetch('/api/stats?iface=' + encodeURIComponent(state.iface) + runQs);
     const j = await r.json();
 
     // Link info